@@ -18,6 +18,9 @@ Options:
 Examples:
     python scripts/run_rent_tests.py --model-only --json  # Quick business modeling
     python scripts/run_rent_tests.py --json               # Full test + modeling
+
+If numba is installed, the shard economics kernel is JIT-compiled (cached on
+disk), which pays off when sweeping many fee/member configurations.
 """
 
 import subprocess
@@ -28,11 +31,25 @@ import sys
 import os
 import urllib.request
 import urllib.error
-from dataclasses import dataclass, field, asdict
-from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from datetime import datetime
+from types import MappingProxyType
 from pathlib import Path
 
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):  # type: ignore[no-redef]
+        """No-op stand-in for numba.njit when numba is not installed"""
+        return lambda func: func
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Constants
 STROOPS_PER_XLM = 10_000_000
 LEDGERS_PER_DAY = 144_000  # ~6 seconds per ledger
@@ -44,7 +61,7 @@ FALLBACK_XLM_PRICE = 0.25
 
 # Baseline cost estimates (stroops) - used in model-only mode
 # These are conservative estimates based on typical Soroban operations
-BASELINE_COSTS = {
+BASELINE_COSTS = MappingProxyType({
     "join_operation": 500_000,      # Member join/registration
     "mint_operation": 100_000,      # Token/file minting
     "transfer_operation": 80_000,   # Token transfers
@@ -52,16 +69,16 @@ BASELINE_COSTS = {
     "storage_per_member": 100,      # Monthly storage per member entry
     "storage_per_file": 150,        # Monthly storage per file entry
     "storage_per_node": 200,        # Monthly storage per node entry
-}
+})
 
-@dataclass
+@dataclass(slots=True)
 class XLMPrice:
     """Current XLM price data"""
     price_usd: float
     timestamp: str
     source: str
 
-@dataclass
+@dataclass(slots=True)
 class OperationMetrics:
     """Metrics for a single operation"""
     operation: str
@@ -69,21 +86,22 @@ class OperationMetrics:
     memory_bytes: int
     estimated_stroops: int
 
-@dataclass
+@dataclass(slots=True)
 class ContractMetrics:
     """Aggregated metrics for a contract"""
     contract_name: str
     operations: List[OperationMetrics] = field(default_factory=list)
-    total_cpu: int = 0
-    total_memory: int = 0
-    total_stroops: int = 0
+    # Derived from operations in __post_init__, so never passed in (and never
+    # double-counted by dataclasses.replace)
+    total_cpu: int = field(default=0, init=False)
+    total_memory: int = field(default=0, init=False)
+    total_stroops: int = field(default=0, init=False)
     test_count: int = 0
 
-    def add_operation(self, op: OperationMetrics):
-        self.operations.append(op)
-        self.total_cpu += op.cpu_instructions
-        self.total_memory += op.memory_bytes
-        self.total_stroops += op.estimated_stroops
+    def __post_init__(self):
+        self.total_cpu = sum(op.cpu_instructions for op in self.operations)
+        self.total_memory = sum(op.memory_bytes for op in self.operations)
+        self.total_stroops = sum(op.estimated_stroops for op in self.operations)
 
     def avg_cpu(self) -> float:
         return self.total_cpu / len(self.operations) if self.operations else 0
@@ -94,7 +112,7 @@ class ContractMetrics:
     def avg_stroops(self) -> float:
         return self.total_stroops / len(self.operations) if self.operations else 0
 
-@dataclass
+@dataclass(slots=True)
 class ShardEconomics:
     """Economics for a single shard"""
     shard_name: str
@@ -122,7 +140,7 @@ class ShardEconomics:
     monthly_profit_usd: float
     profit_margin_pct: float
 
-@dataclass
+@dataclass(slots=True)
 class NetworkProjection:
     """Network-wide projection across multiple shards"""
     scenario: str
@@ -145,6 +163,15 @@ class NetworkProjection:
     # Per-shard averages
     avg_profit_per_shard_usd: float
 
+@dataclass(slots=True)
+class ContractCosts:
+    """A contract's metrics with XLM/USD conversions precomputed for the report/export sinks"""
+    metrics: ContractMetrics
+    total_xlm: float
+    total_usd: float
+    avg_usd: float
+    operations: List[Tuple[OperationMetrics, float, float]]  # (op, xlm, usd)
+
 # Contract directories to test
 CONTRACTS = [
     ("hvym-roster", "hvym-roster"),
@@ -176,6 +203,10 @@ def fetch_xlm_price() -> XLMPrice:
             source="Fallback (API unavailable)"
         )
 
+def _shallow(obj) -> dict:
+    """Shallow dataclass-to-dict conversion (our dataclasses only hold primitives, so no deepcopy needed)"""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
 def stroops_to_xlm(stroops: int) -> float:
     """Convert stroops to XLM"""
     return stroops / STROOPS_PER_XLM
@@ -213,7 +244,15 @@ def run_rent_tests(contract_path: str, verbose: bool = False) -> str:
 
 def parse_test_output(output: str, contract_name: str) -> ContractMetrics:
     """Parse test output to extract metrics"""
-    metrics = ContractMetrics(contract_name=contract_name)
+
+    # Cheap substring checks before any regex work: a build that failed to
+    # compile, or a run that never reached the rent tests, has nothing to parse
+    if output.find('error[E') != -1:
+        return ContractMetrics(contract_name=contract_name)
+    if output.find('rent_test') == -1 and output.find('Estimated Stroops') == -1:
+        return ContractMetrics(contract_name=contract_name)
+
+    operations: List[OperationMetrics] = []
 
     table_pattern = r'([a-zA-Z0-9_\.\s]+?)\s{2,}(\d+)\s+(\d+)\s+(\d+)'
 
@@ -239,7 +278,7 @@ def parse_test_output(output: str, contract_name: str) -> ContractMetrics:
                     memory_bytes=mem,
                     estimated_stroops=stroops
                 )
-                metrics.add_operation(op)
+                operations.append(op)
 
         cpu_match = re.search(r'CPU Instructions:\s*(\d+)', line)
         if cpu_match:
@@ -253,21 +292,72 @@ def parse_test_output(output: str, contract_name: str) -> ContractMetrics:
         if stroops_match and current_cpu and current_mem:
             stroops = int(stroops_match.group(1))
             op = OperationMetrics(
-                operation=f"operation_{len(metrics.operations)}",
+                operation=f"operation_{len(operations)}",
                 cpu_instructions=current_cpu,
                 memory_bytes=current_mem,
                 estimated_stroops=stroops
             )
-            metrics.add_operation(op)
+            operations.append(op)
             current_cpu = None
             current_mem = None
 
+    # Totals are computed once over the finished list
+    metrics = ContractMetrics(contract_name=contract_name, operations=operations)
+
     test_count_match = re.search(r'(\d+) passed', output)
     if test_count_match:
         metrics.test_count = int(test_count_match.group(1))
 
     return metrics
 
+@njit(cache=True)
+def _shard_econ_kernel(
+    members_active,
+    files_per_month,
+    nodes,
+    join_fee_xlm,
+    mint_fee_xlm,
+    monthly_sub_xlm,
+    avg_join_stroops,
+    avg_mint_stroops,
+    avg_node_stroops,
+    price_usd,
+    new_members_per_month
+):
+    """Pure numeric core of calculate_shard_economics (JIT-compiled when numba is available)"""
+
+    # Monthly costs (transaction + storage), grouped per driver so the storage
+    # rent literals fold into the per-unit coefficients at compile time.
+    # Storage rent (stroops/month) matches BASELINE_COSTS["storage_per_*"]:
+    # 100 per member, 150 per file (12 months of files held, rough estimate),
+    # 200 per node.
+    total_cost_stroops = (
+        new_members_per_month * avg_join_stroops +
+        files_per_month * (avg_mint_stroops + 12 * 150) +
+        nodes * (avg_node_stroops + 200) +  # node maintenance/updates + storage
+        members_active * 100
+    )
+    total_cost_xlm = total_cost_stroops / STROOPS_PER_XLM
+    total_cost_usd = total_cost_xlm * price_usd
+
+    # Monthly revenue
+    join_revenue = new_members_per_month * join_fee_xlm
+    mint_revenue = files_per_month * mint_fee_xlm
+    subscription_revenue = members_active * monthly_sub_xlm
+
+    total_revenue_xlm = join_revenue + mint_revenue + subscription_revenue
+    # Zero-fee configurations (common in sweeps) have nothing to convert
+    total_revenue_usd = total_revenue_xlm * price_usd if total_revenue_xlm != 0 else 0.0
+
+    # Profit
+    profit_xlm = total_revenue_xlm - total_cost_xlm
+    profit_usd = total_revenue_usd - total_cost_usd
+    profit_margin = (profit_xlm / total_revenue_xlm * 100) if total_revenue_xlm > 0 else 0.0
+
+    return (total_cost_stroops, total_cost_xlm, total_cost_usd,
+            total_revenue_xlm, total_revenue_usd,
+            profit_xlm, profit_usd, profit_margin)
+
 def calculate_shard_economics(
     shard_name: str,
     member_cap: int,
@@ -284,42 +374,22 @@ def calculate_shard_economics(
     new_members_per_month: int = 0
 ) -> ShardEconomics:
     """Calculate economics for a single shard"""
-
-    # Storage rent estimates (stroops/month)
-    storage_rent_per_member = 100
-    storage_rent_per_file = 150
-    storage_rent_per_node = 200
-
-    # Monthly costs (transaction + storage)
-    tx_cost_stroops = (
-        new_members_per_month * avg_join_stroops +
-        files_per_month * avg_mint_stroops +
-        nodes * avg_node_stroops  # node maintenance/updates
+    (total_cost_stroops, total_cost_xlm, total_cost_usd,
+     total_revenue_xlm, total_revenue_usd,
+     profit_xlm, profit_usd, profit_margin) = _shard_econ_kernel(
+        members_active,
+        files_per_month,
+        nodes,
+        join_fee_xlm,
+        mint_fee_xlm,
+        monthly_sub_xlm,
+        avg_join_stroops,
+        avg_mint_stroops,
+        avg_node_stroops,
+        xlm_price.price_usd,
+        new_members_per_month
     )
 
-    storage_cost_stroops = (
-        members_active * storage_rent_per_member +
-        (files_per_month * 12) * storage_rent_per_file +  # cumulative files (rough estimate)
-        nodes * storage_rent_per_node
-    )
-
-    total_cost_stroops = tx_cost_stroops + storage_cost_stroops
-    total_cost_xlm = stroops_to_xlm(total_cost_stroops)
-    total_cost_usd = xlm_to_usd(total_cost_xlm, xlm_price)
-
-    # Monthly revenue
-    join_revenue = new_members_per_month * join_fee_xlm
-    mint_revenue = files_per_month * mint_fee_xlm
-    subscription_revenue = members_active * monthly_sub_xlm
-
-    total_revenue_xlm = join_revenue + mint_revenue + subscription_revenue
-    total_revenue_usd = xlm_to_usd(total_revenue_xlm, xlm_price)
-
-    # Profit
-    profit_xlm = total_revenue_xlm - total_cost_xlm
-    profit_usd = total_revenue_usd - total_cost_usd
-    profit_margin = (profit_xlm / total_revenue_xlm * 100) if total_revenue_xlm > 0 else 0
-
     return ShardEconomics(
         shard_name=shard_name,
         member_cap=member_cap,
@@ -434,106 +504,128 @@ def calculate_network_projections(
 
     return shard_examples, network_projections
 
-def print_report(
+def calculate_contract_costs(
     all_metrics: Dict[str, ContractMetrics],
+    xlm_price: XLMPrice
+) -> Dict[str, ContractCosts]:
+    """Convert every contract's stroop figures to XLM/USD once, for all output sinks"""
+    contract_costs = {}
+    for name, metrics in all_metrics.items():
+        total_xlm = stroops_to_xlm(metrics.total_stroops)
+        operations = []
+        for op in metrics.operations:
+            op_xlm = stroops_to_xlm(op.estimated_stroops)
+            operations.append((op, op_xlm, xlm_to_usd(op_xlm, xlm_price)))
+        contract_costs[name] = ContractCosts(
+            metrics=metrics,
+            total_xlm=total_xlm,
+            total_usd=xlm_to_usd(total_xlm, xlm_price),
+            avg_usd=stroops_to_usd(int(metrics.avg_stroops()), xlm_price),
+            operations=operations
+        )
+    return contract_costs
+
+def print_report(
+    contract_costs: Dict[str, ContractCosts],
     shard_examples: List[ShardEconomics],
     network_projections: List[NetworkProjection],
     xlm_price: XLMPrice,
     model_only: bool = False
 ):
     """Print a comprehensive report"""
-    print("\n" + "=" * 110)
+    lines = []
+
+    lines.append("\n" + "=" * 110)
     if model_only:
-        print("PINTHEON CONTRACTS - BUSINESS MODEL ANALYSIS REPORT")
-        print("=" * 110)
-        print("NOTE: Using baseline cost estimates (no contract tests run)")
+        lines.append("PINTHEON CONTRACTS - BUSINESS MODEL ANALYSIS REPORT")
+        lines.append("=" * 110)
+        lines.append("NOTE: Using baseline cost estimates (no contract tests run)")
     else:
-        print("PINTHEON CONTRACTS - RENT & REVENUE ESTIMATION REPORT")
-        print("=" * 110)
-    print(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"XLM Price: ${xlm_price.price_usd:.4f} USD (Source: {xlm_price.source})")
-    print(f"Price Timestamp: {xlm_price.timestamp}")
-    print()
+        lines.append("PINTHEON CONTRACTS - RENT & REVENUE ESTIMATION REPORT")
+        lines.append("=" * 110)
+    lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append(f"XLM Price: ${xlm_price.price_usd:.4f} USD (Source: {xlm_price.source})")
+    lines.append(f"Price Timestamp: {xlm_price.timestamp}")
+    lines.append("")
 
     # Conversion reference
-    print("-" * 110)
-    print("CONVERSION REFERENCE")
-    print("-" * 110)
-    print(f"  1 XLM = {STROOPS_PER_XLM:,} stroops")
-    print(f"  1 XLM = ${xlm_price.price_usd:.4f} USD")
-    print(f"  1,000,000 stroops = {stroops_to_xlm(1_000_000):.2f} XLM = ${stroops_to_usd(1_000_000, xlm_price):.4f} USD")
-    print()
+    lines.append("-" * 110)
+    lines.append("CONVERSION REFERENCE")
+    lines.append("-" * 110)
+    lines.append(f"  1 XLM = {STROOPS_PER_XLM:,} stroops")
+    lines.append(f"  1 XLM = ${xlm_price.price_usd:.4f} USD")
+    lines.append(f"  1,000,000 stroops = {stroops_to_xlm(1_000_000):.2f} XLM = ${stroops_to_usd(1_000_000, xlm_price):.4f} USD")
+    lines.append("")
 
     # Contract-by-contract breakdown
-    print("-" * 110)
-    print("CONTRACT COST ANALYSIS")
-    print("-" * 110)
+    lines.append("-" * 110)
+    lines.append("CONTRACT COST ANALYSIS")
+    lines.append("-" * 110)
 
     total_stroops_all = 0
     total_operations = 0
 
-    for contract_name, metrics in all_metrics.items():
+    for contract_name, costs in contract_costs.items():
+        metrics = costs.metrics
         if metrics.operations:
-            xlm_total = stroops_to_xlm(metrics.total_stroops)
-            usd_total = xlm_to_usd(xlm_total, xlm_price)
 
-            print(f"\n  {contract_name.upper()}")
-            print(f"    Tests passed: {metrics.test_count}")
-            print(f"    Operations measured: {len(metrics.operations)}")
-            print(f"    Total: {metrics.total_stroops:,} stroops = {xlm_total:.4f} XLM = ${usd_total:.4f} USD")
-            print(f"    Avg per op: {metrics.avg_stroops():,.0f} stroops = ${stroops_to_usd(int(metrics.avg_stroops()), xlm_price):.4f} USD")
+            lines.append(f"\n  {contract_name.upper()}")
+            lines.append(f"    Tests passed: {metrics.test_count}")
+            lines.append(f"    Operations measured: {len(metrics.operations)}")
+            lines.append(f"    Total: {metrics.total_stroops:,} stroops = {costs.total_xlm:.4f} XLM = ${costs.total_usd:.4f} USD")
+            lines.append(f"    Avg per op: {metrics.avg_stroops():,.0f} stroops = ${costs.avg_usd:.4f} USD")
 
             total_stroops_all += metrics.total_stroops
             total_operations += len(metrics.operations)
 
     # Shard Economics
-    print("\n" + "-" * 110)
-    print("SHARD ECONOMICS (Single Shard Analysis)")
-    print("-" * 110)
-    print(f"  Member Cap per Shard: {shard_examples[0].member_cap}")
-    print(f"  Fee Structure: Join=${shard_examples[0].join_fee_xlm} XLM, Mint=${shard_examples[0].mint_fee_xlm} XLM, Sub=${shard_examples[0].monthly_subscription_xlm} XLM/mo")
-    print()
-    print(f"  {'Shard Stage':<22} {'Members':>8} {'Files/Mo':>10} {'Cost/Mo':>12} {'Revenue/Mo':>12} {'Profit/Mo':>12} {'Margin':>8}")
-    print("  " + "-" * 104)
+    lines.append("\n" + "-" * 110)
+    lines.append("SHARD ECONOMICS (Single Shard Analysis)")
+    lines.append("-" * 110)
+    lines.append(f"  Member Cap per Shard: {shard_examples[0].member_cap}")
+    lines.append(f"  Fee Structure: Join=${shard_examples[0].join_fee_xlm} XLM, Mint=${shard_examples[0].mint_fee_xlm} XLM, Sub=${shard_examples[0].monthly_subscription_xlm} XLM/mo")
+    lines.append("")
+    lines.append(f"  {'Shard Stage':<22} {'Members':>8} {'Files/Mo':>10} {'Cost/Mo':>12} {'Revenue/Mo':>12} {'Profit/Mo':>12} {'Margin':>8}")
+    lines.append("  " + "-" * 104)
 
     for shard in shard_examples:
-        print(f"  {shard.shard_name:<22} {shard.members_active:>8} {shard.files_per_month:>10} "
-              f"${shard.monthly_cost_usd:>10.2f} ${shard.monthly_revenue_usd:>10.2f} "
-              f"${shard.monthly_profit_usd:>10.2f} {shard.profit_margin_pct:>7.1f}%")
+        lines.append(f"  {shard.shard_name:<22} {shard.members_active:>8} {shard.files_per_month:>10} "
+                     f"${shard.monthly_cost_usd:>10.2f} ${shard.monthly_revenue_usd:>10.2f} "
+                     f"${shard.monthly_profit_usd:>10.2f} {shard.profit_margin_pct:>7.1f}%")
 
     # Network Projections
-    print("\n" + "-" * 110)
-    print("NETWORK PROJECTIONS (Multi-Shard Scaling)")
-    print("-" * 110)
-    print(f"  {'Scenario':<18} {'Shards':>8} {'Members':>10} {'Mo. Cost':>14} {'Mo. Revenue':>14} {'Mo. Profit':>14} {'Yr. Profit':>14}")
-    print("  " + "-" * 104)
+    lines.append("\n" + "-" * 110)
+    lines.append("NETWORK PROJECTIONS (Multi-Shard Scaling)")
+    lines.append("-" * 110)
+    lines.append(f"  {'Scenario':<18} {'Shards':>8} {'Members':>10} {'Mo. Cost':>14} {'Mo. Revenue':>14} {'Mo. Profit':>14} {'Yr. Profit':>14}")
+    lines.append("  " + "-" * 104)
 
     for proj in network_projections:
-        print(f"  {proj.scenario:<18} {proj.num_shards:>8,} {proj.total_members:>10,} "
-              f"${proj.total_monthly_cost_usd:>12,.0f} ${proj.total_monthly_revenue_usd:>12,.0f} "
-              f"${proj.total_monthly_profit_usd:>12,.0f} ${proj.yearly_profit_usd:>12,.0f}")
+        lines.append(f"  {proj.scenario:<18} {proj.num_shards:>8,} {proj.total_members:>10,} "
+                     f"${proj.total_monthly_cost_usd:>12,.0f} ${proj.total_monthly_revenue_usd:>12,.0f} "
+                     f"${proj.total_monthly_profit_usd:>12,.0f} ${proj.yearly_profit_usd:>12,.0f}")
 
     # Franchise/Shard Admin Economics
-    print("\n" + "-" * 110)
-    print("SHARD ADMIN ECONOMICS (Franchise Model)")
-    print("-" * 110)
+    lines.append("\n" + "-" * 110)
+    lines.append("SHARD ADMIN ECONOMICS (Franchise Model)")
+    lines.append("-" * 110)
 
     mature_shard = shard_examples[2]  # 75% full shard
-    print(f"  Scenario: Admin running a mature shard (75% capacity, {mature_shard.members_active} members)")
-    print()
-    print(f"  Monthly Revenue:     ${mature_shard.monthly_revenue_usd:>10.2f} USD ({mature_shard.monthly_revenue_xlm:.2f} XLM)")
-    print(f"  Monthly Costs:       ${mature_shard.monthly_cost_usd:>10.2f} USD ({mature_shard.monthly_cost_xlm:.2f} XLM)")
-    print(f"  Monthly Profit:      ${mature_shard.monthly_profit_usd:>10.2f} USD ({mature_shard.monthly_profit_xlm:.2f} XLM)")
-    print(f"  Annual Profit:       ${mature_shard.monthly_profit_usd * 12:>10.2f} USD")
-    print(f"  Profit Margin:       {mature_shard.profit_margin_pct:.1f}%")
-    print()
-    print("  Incentive: Members who reach shard capacity can spawn & admin new shards,")
-    print("             earning ongoing revenue from their member community.")
+    lines.append(f"  Scenario: Admin running a mature shard (75% capacity, {mature_shard.members_active} members)")
+    lines.append("")
+    lines.append(f"  Monthly Revenue:     ${mature_shard.monthly_revenue_usd:>10.2f} USD ({mature_shard.monthly_revenue_xlm:.2f} XLM)")
+    lines.append(f"  Monthly Costs:       ${mature_shard.monthly_cost_usd:>10.2f} USD ({mature_shard.monthly_cost_xlm:.2f} XLM)")
+    lines.append(f"  Monthly Profit:      ${mature_shard.monthly_profit_usd:>10.2f} USD ({mature_shard.monthly_profit_xlm:.2f} XLM)")
+    lines.append(f"  Annual Profit:       ${mature_shard.monthly_profit_usd * 12:>10.2f} USD")
+    lines.append(f"  Profit Margin:       {mature_shard.profit_margin_pct:.1f}%")
+    lines.append("")
+    lines.append("  Incentive: Members who reach shard capacity can spawn & admin new shards,")
+    lines.append("             earning ongoing revenue from their member community.")
 
     # Break-even Analysis
-    print("\n" + "-" * 110)
-    print("BREAK-EVEN ANALYSIS")
-    print("-" * 110)
+    lines.append("\n" + "-" * 110)
+    lines.append("BREAK-EVEN ANALYSIS")
+    lines.append("-" * 110)
 
     # Calculate break-even point
     new_shard = shard_examples[0]
@@ -548,13 +640,15 @@ def print_report(
                 members_for_breakeven = i
                 break
 
-        print(f"  Estimated break-even: ~{members_for_breakeven} active members per shard")
-        print(f"  At {new_shard.member_cap} member cap: {(members_for_breakeven/new_shard.member_cap)*100:.0f}% capacity needed for profitability")
+        lines.append(f"  Estimated break-even: ~{members_for_breakeven} active members per shard")
+        lines.append(f"  At {new_shard.member_cap} member cap: {(members_for_breakeven/new_shard.member_cap)*100:.0f}% capacity needed for profitability")
 
-    print("\n" + "=" * 110)
+    lines.append("\n" + "=" * 110)
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 def export_json(
-    all_metrics: Dict[str, ContractMetrics],
+    contract_costs: Dict[str, ContractCosts],
     shard_examples: List[ShardEconomics],
     network_projections: List[NetworkProjection],
     xlm_price: XLMPrice,
@@ -562,7 +656,10 @@ def export_json(
     model_only: bool = False
 ):
     """Export results to JSON"""
-    data = {
+    # orjson serializes dataclasses natively; the json module needs dicts
+    convert: Callable[[Any], Any] = (lambda obj: obj) if HAS_ORJSON else _shallow
+
+    data: Dict[str, Any] = {
         "generated": datetime.now().isoformat(),
         "mode": "model-only (baseline estimates)" if model_only else "full (test-derived)",
         "xlm_price": {
@@ -570,119 +667,131 @@ def export_json(
             "timestamp": xlm_price.timestamp,
             "source": xlm_price.source
         },
-        "contracts": {},
-        "shard_examples": [],
-        "network_projections": []
+        "contracts": {
+            name: {
+                "test_count": costs.metrics.test_count,
+                "total_cpu": costs.metrics.total_cpu,
+                "total_memory": costs.metrics.total_memory,
+                "total_stroops": costs.metrics.total_stroops,
+                "total_xlm": costs.total_xlm,
+                "total_usd": costs.total_usd,
+                "operations": [convert(op) for op in costs.metrics.operations]
+            }
+            for name, costs in contract_costs.items()
+        },
+        "shard_examples": [convert(s) for s in shard_examples],
+        "network_projections": [convert(p) for p in network_projections]
     }
 
-    for name, metrics in all_metrics.items():
-        xlm_total = stroops_to_xlm(metrics.total_stroops)
-        data["contracts"][name] = {
-            "test_count": metrics.test_count,
-            "total_cpu": metrics.total_cpu,
-            "total_memory": metrics.total_memory,
-            "total_stroops": metrics.total_stroops,
-            "total_xlm": xlm_total,
-            "total_usd": xlm_to_usd(xlm_total, xlm_price),
-            "operations": [asdict(op) for op in metrics.operations]
-        }
-
-    data["shard_examples"] = [asdict(s) for s in shard_examples]
-    data["network_projections"] = [asdict(p) for p in network_projections]
-
-    with open(filepath, 'w') as f:
-        json.dump(data, f, indent=2)
+    if HAS_ORJSON:
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(filepath, 'w') as f:
+            json.dump(data, f, indent=2)
     print(f"Results exported to {filepath}")
 
 def export_csv(
-    all_metrics: Dict[str, ContractMetrics],
+    contract_costs: Dict[str, ContractCosts],
     shard_examples: List[ShardEconomics],
     network_projections: List[NetworkProjection],
     xlm_price: XLMPrice,
     filepath: str
 ):
     """Export results to CSV"""
-    with open(filepath, 'w', newline='') as f:
-        writer = csv.writer(f)
-
+    rows: List[list] = [
         # Header info
-        writer.writerow(["Pintheon Rent & Revenue Estimation"])
-        writer.writerow(["Generated", datetime.now().isoformat()])
-        writer.writerow(["XLM Price USD", xlm_price.price_usd])
-        writer.writerow(["Price Source", xlm_price.source])
-        writer.writerow([])
+        ["Pintheon Rent & Revenue Estimation"],
+        ["Generated", datetime.now().isoformat()],
+        ["XLM Price USD", xlm_price.price_usd],
+        ["Price Source", xlm_price.source],
+        [],
 
         # Operations data
-        writer.writerow(["CONTRACT OPERATIONS"])
-        writer.writerow(["Contract", "Operation", "CPU Instructions", "Memory Bytes", "Stroops", "XLM", "USD"])
-        for name, metrics in all_metrics.items():
-            for op in metrics.operations:
-                xlm = stroops_to_xlm(op.estimated_stroops)
-                usd = xlm_to_usd(xlm, xlm_price)
-                writer.writerow([name, op.operation, op.cpu_instructions, op.memory_bytes,
-                               op.estimated_stroops, f"{xlm:.6f}", f"{usd:.6f}"])
-
-        writer.writerow([])
-
-        # Shard economics
-        writer.writerow(["SHARD ECONOMICS"])
-        writer.writerow(["Shard", "Members", "Files/Mo", "Cost USD", "Revenue USD", "Profit USD", "Margin %"])
-        for s in shard_examples:
-            writer.writerow([s.shard_name, s.members_active, s.files_per_month,
-                           f"{s.monthly_cost_usd:.2f}", f"{s.monthly_revenue_usd:.2f}",
-                           f"{s.monthly_profit_usd:.2f}", f"{s.profit_margin_pct:.1f}"])
-
-        writer.writerow([])
-
-        # Network projections
-        writer.writerow(["NETWORK PROJECTIONS"])
-        writer.writerow(["Scenario", "Shards", "Members", "Monthly Cost USD", "Monthly Revenue USD",
-                        "Monthly Profit USD", "Yearly Profit USD"])
-        for p in network_projections:
-            writer.writerow([p.scenario, p.num_shards, p.total_members,
-                           f"{p.total_monthly_cost_usd:.0f}", f"{p.total_monthly_revenue_usd:.0f}",
-                           f"{p.total_monthly_profit_usd:.0f}", f"{p.yearly_profit_usd:.0f}"])
+        ["CONTRACT OPERATIONS"],
+        ["Contract", "Operation", "CPU Instructions", "Memory Bytes", "Stroops", "XLM", "USD"],
+    ]
+    rows.extend(
+        [name, op.operation, op.cpu_instructions, op.memory_bytes, op.estimated_stroops,
+         f"{xlm:.6f}", f"{usd:.6f}"]
+        for name, costs in contract_costs.items()
+        for op, xlm, usd in costs.operations
+    )
+    rows.append([])
+
+    # Shard economics
+    rows.append(["SHARD ECONOMICS"])
+    rows.append(["Shard", "Members", "Files/Mo", "Cost USD", "Revenue USD", "Profit USD", "Margin %"])
+    rows.extend(
+        [s.shard_name, s.members_active, s.files_per_month,
+         f"{s.monthly_cost_usd:.2f}", f"{s.monthly_revenue_usd:.2f}",
+         f"{s.monthly_profit_usd:.2f}", f"{s.profit_margin_pct:.1f}"]
+        for s in shard_examples
+    )
+    rows.append([])
+
+    # Network projections
+    rows.append(["NETWORK PROJECTIONS"])
+    rows.append(["Scenario", "Shards", "Members", "Monthly Cost USD", "Monthly Revenue USD",
+                 "Monthly Profit USD", "Yearly Profit USD"])
+    rows.extend(
+        [p.scenario, p.num_shards, p.total_members,
+         f"{p.total_monthly_cost_usd:.0f}", f"{p.total_monthly_revenue_usd:.0f}",
+         f"{p.total_monthly_profit_usd:.0f}", f"{p.yearly_profit_usd:.0f}"]
+        for p in network_projections
+    )
+
+    with open(filepath, 'w', newline='') as f:
+        csv.writer(f).writerows(rows)
 
     print(f"Results exported to {filepath}")
 
 def create_baseline_metrics() -> Dict[str, ContractMetrics]:
     """Create baseline metrics using estimated costs (no tests required)"""
+    join_cost, mint_cost, transfer_cost, node_cost = (
+        BASELINE_COSTS[k] for k in ("join_operation", "mint_operation", "transfer_operation", "node_operation")
+    )
     metrics = {}
 
     # Collective contract baseline
-    collective = ContractMetrics(contract_name="hvym-collective")
-    collective.add_operation(OperationMetrics("join", 40_000_000, 1_000_000, BASELINE_COSTS["join_operation"]))
-    collective.add_operation(OperationMetrics("fund", 30_000_000, 800_000, BASELINE_COSTS["transfer_operation"]))
-    collective.add_operation(OperationMetrics("withdraw", 30_000_000, 800_000, BASELINE_COSTS["transfer_operation"]))
-    collective.add_operation(OperationMetrics("publish_file", 35_000_000, 900_000, BASELINE_COSTS["mint_operation"]))
+    collective = ContractMetrics(contract_name="hvym-collective", operations=[
+        OperationMetrics("join", 40_000_000, 1_000_000, join_cost),
+        OperationMetrics("fund", 30_000_000, 800_000, transfer_cost),
+        OperationMetrics("withdraw", 30_000_000, 800_000, transfer_cost),
+        OperationMetrics("publish_file", 35_000_000, 900_000, mint_cost),
+    ])
     collective.test_count = 4
     metrics["hvym-collective"] = collective
 
     # IPFS token baseline
-    ipfs_token = ContractMetrics(contract_name="pintheon-ipfs-token")
-    ipfs_token.add_operation(OperationMetrics("mint", 35_000_000, 900_000, BASELINE_COSTS["mint_operation"]))
-    ipfs_token.add_operation(OperationMetrics("transfer", 25_000_000, 700_000, BASELINE_COSTS["transfer_operation"]))
+    ipfs_token = ContractMetrics(contract_name="pintheon-ipfs-token", operations=[
+        OperationMetrics("mint", 35_000_000, 900_000, mint_cost),
+        OperationMetrics("transfer", 25_000_000, 700_000, transfer_cost),
+    ])
     ipfs_token.test_count = 2
     metrics["pintheon-ipfs-token"] = ipfs_token
 
     # Node token baseline
-    node_token = ContractMetrics(contract_name="pintheon-node-token")
-    node_token.add_operation(OperationMetrics("mint", 35_000_000, 900_000, BASELINE_COSTS["node_operation"]))
-    node_token.add_operation(OperationMetrics("transfer", 25_000_000, 700_000, BASELINE_COSTS["transfer_operation"]))
+    node_token = ContractMetrics(contract_name="pintheon-node-token", operations=[
+        OperationMetrics("mint", 35_000_000, 900_000, node_cost),
+        OperationMetrics("transfer", 25_000_000, 700_000, transfer_cost),
+    ])
     node_token.test_count = 2
     metrics["pintheon-node-token"] = node_token
 
     # Opus token baseline
-    opus_token = ContractMetrics(contract_name="opus_token")
-    opus_token.add_operation(OperationMetrics("mint", 35_000_000, 900_000, BASELINE_COSTS["mint_operation"]))
-    opus_token.add_operation(OperationMetrics("transfer", 25_000_000, 700_000, BASELINE_COSTS["transfer_operation"]))
+    opus_token = ContractMetrics(contract_name="opus_token", operations=[
+        OperationMetrics("mint", 35_000_000, 900_000, mint_cost),
+        OperationMetrics("transfer", 25_000_000, 700_000, transfer_cost),
+    ])
     opus_token.test_count = 2
     metrics["opus_token"] = opus_token
 
     # Roster baseline
-    roster = ContractMetrics(contract_name="hvym-roster")
-    roster.add_operation(OperationMetrics("add_member", 40_000_000, 1_000_000, BASELINE_COSTS["join_operation"]))
-    roster.add_operation(OperationMetrics("get_member", 20_000_000, 500_000, 50_000))
+    roster = ContractMetrics(contract_name="hvym-roster", operations=[
+        OperationMetrics("add_member", 40_000_000, 1_000_000, join_cost),
+        OperationMetrics("get_member", 20_000_000, 500_000, 50_000),
+    ])
     roster.test_count = 2
     metrics["hvym-roster"] = roster
 
@@ -739,16 +848,19 @@ def main():
     # Calculate projections
     shard_examples, network_projections = calculate_network_projections(all_metrics, xlm_price)
 
+    # Convert costs once for every output sink
+    contract_costs = calculate_contract_costs(all_metrics, xlm_price)
+
     # Print report
-    print_report(all_metrics, shard_examples, network_projections, xlm_price, model_only)
+    print_report(contract_costs, shard_examples, network_projections, xlm_price, model_only)
 
     # Export if requested
     if output_json:
-        export_json(all_metrics, shard_examples, network_projections, xlm_price,
+        export_json(contract_costs, shard_examples, network_projections, xlm_price,
                    str(project_root / "rent_estimation_results.json"), model_only)
 
     if output_csv:
-        export_csv(all_metrics, shard_examples, network_projections, xlm_price,
+        export_csv(contract_costs, shard_examples, network_projections, xlm_price,
                   str(project_root / "rent_estimation_results.csv"))
 
     return 0
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
+import argparse
 import os
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Define test order (same as build order)
 TEST_ORDER = [
@@ -16,22 +18,120 @@ TEST_ORDER = [
     "hvym-cert-registry"
 ]
 
-def run_tests(contract_dir):
-    print(f"\n=== Running tests in {contract_dir} ===")
+def run_tests(contract_dir, cargo_jobs=None, stream=False):
+    """Run `cargo test` in contract_dir and return (success, output).
+
+    When stream is false the output is captured and returned, so that
+    crates tested concurrently do not interleave their logs; when true it
+    goes straight to the console and only error lines are returned.
+    cargo_jobs caps cargo's own build parallelism (CARGO_BUILD_JOBS) unless
+    the caller's environment already sets it.
+    """
+    header = f"\n=== Running tests in {contract_dir} ===\n"
+    if stream:
+        print(header, end="", flush=True)
+        header = ""
+    if not os.path.isfile(os.path.join(contract_dir, "Cargo.toml")):
+        return False, header + f"Error: No Cargo.toml found in {contract_dir}. Not a Rust crate.\n"
+    env = None
+    if cargo_jobs is not None and "CARGO_BUILD_JOBS" not in os.environ:
+        env = {**os.environ, "CARGO_BUILD_JOBS": str(cargo_jobs)}
     try:
-        subprocess.run(["python", "test_contract.py", contract_dir], check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error running tests in {contract_dir}: {e}")
-        return False
+        if stream:
+            result = subprocess.run(["cargo", "test"], cwd=contract_dir, env=env)
+            output = ""
+        else:
+            result = subprocess.run(
+                ["cargo", "test"],
+                cwd=contract_dir,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True
+            )
+            output = header + result.stdout
+    except OSError as e:
+        # e.g. cargo not on PATH; report it like any other failed crate
+        return False, header + f"Error running tests in {contract_dir}: {e}\n"
+    if result.returncode != 0:
+        output += f"Error running tests in {contract_dir}: cargo test exited with status {result.returncode}\n"
+        return False, output
+    return True, output
 
 def main():
+    parser = argparse.ArgumentParser(description="Run cargo test for every contract crate.")
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=min(2, os.cpu_count() or 1),
+        help="Number of crates to test at once (default: 2, or 1 on a single-CPU machine). Each crate is a separate "
+             "soroban dependency tree, so every extra job adds a full rustc build's "
+             "worth of memory; 1 runs serially and streams cargo output live",
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action=argparse.BooleanOptionalAction,
+        default=bool(os.environ.get("CI")),
+        help="Stop scheduling crates after the first failure (default: on when CI is set)",
+    )
+    args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    jobs = min(args.jobs, len(TEST_ORDER))
+    # Split the CPUs between the concurrent cargo processes instead of
+    # letting each one start a rustc per core
+    cargo_jobs = max(1, (os.cpu_count() or 1) // jobs)
+
     all_success = True
-    for contract in TEST_ORDER:
-        if not run_tests(contract):
+
+    def report(contract, success, output):
+        nonlocal all_success
+        print(output, end="", flush=True)
+        if not success:
             all_success = False
             print(f"Tests failed for {contract}")
-    
+
+    if jobs == 1:
+        for index, contract in enumerate(TEST_ORDER):
+            success, output = run_tests(contract, cargo_jobs, stream=True)
+            report(contract, success, output)
+            if args.fail_fast and not success:
+                for skipped in TEST_ORDER[index + 1:]:
+                    print(f"\n=== Skipped {skipped} (fail-fast) ===")
+                break
+    else:
+        results = {}
+        next_index = 0
+        # The crates are independent (tests only read release WASM produced
+        # by the build step), so run them concurrently; each worker just
+        # waits on a cargo subprocess, so threads are enough
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = {contract: executor.submit(run_tests, contract, cargo_jobs) for contract in TEST_ORDER}
+            contract_of = {future: contract for contract, future in futures.items()}
+            for future in as_completed(contract_of):
+                if future.cancelled():
+                    continue
+                results[contract_of[future]] = future.result()
+                # Report in TEST_ORDER as soon as every earlier crate is done
+                while next_index < len(TEST_ORDER) and TEST_ORDER[next_index] in results:
+                    contract = TEST_ORDER[next_index]
+                    report(contract, *results[contract])
+                    next_index += 1
+                if args.fail_fast and not results[contract_of[future]][0]:
+                    # Crates already running finish; the rest never start
+                    for pending in contract_of:
+                        pending.cancel()
+                    break
+
+        # With --fail-fast, report whatever finished after the failure and
+        # list the crates that were skipped
+        for contract in TEST_ORDER[next_index:]:
+            future = futures[contract]
+            if future.cancelled():
+                print(f"\n=== Skipped {contract} (fail-fast) ===")
+                continue
+            report(contract, *future.result())
+
     if not all_success:
         print("\nSome tests failed!")
         sys.exit(1)